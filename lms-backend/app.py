@@ -2,21 +2,31 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from models import db
+import sessions
 from routes.auth import auth_bp
 from routes.admin import admin_bp
+from routes.circulation import circulation_bp
 
-def create_app():
-    """Application factory"""
+def create_app(config=None):
+    """Application factory
+
+    `config` overrides settings from Config, e.g. scripts pass
+    {'SESSION_SWEEPER_ENABLED': False}.
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config:
+        app.config.update(config)
     
     # Initialize extensions
     db.init_app(app)
+    sessions.init_app(app)
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(circulation_bp, url_prefix='/api/circulation')
     
     # Create tables
     with app.app_context():
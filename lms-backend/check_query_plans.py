@@ -0,0 +1,183 @@
+"""
+Query plan regression checks
+Runs EXPLAIN on the hot queries behind the auth, admin and circulation routes,
+the session store and the streaming exports, and fails if a sequential scan or
+a sort touches a table above the row threshold.
+Load realistic volumes first with generate_data.py, otherwise every table is
+below the threshold and the checks pass trivially.
+
+Exit code is 1 if any check fails, so this can run in CI.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, text
+from app import create_app
+from models import db, User, Role, Book, BookCopy, Borrow, AuditLog, UserSession
+from exports import build_export_query
+from sessions import session_lookup_query, session_version_query, expired_sessions_delete
+
+DEFAULT_THRESHOLD = 10000
+
+def sample(column, default):
+    """Pick a real value for a bind parameter so plans use realistic selectivity"""
+    value = db.session.query(column).limit(1).scalar()
+    return default if value is None else value
+
+def count_statement(query):
+    """The SELECT count(*) FROM (subquery) that Query.count() emits"""
+    return select(func.count()).select_from(query.subquery())
+
+def hot_queries():
+    """(name, statement, tables allowed to seq scan) for every hot query
+
+    Mirrors the ORM queries issued by the routes; keep in sync when they change.
+    """
+    student_role_id = sample(Role.role_id, 1)
+    user_id = sample(User.user_id, 1)
+    email = sample(User.email, 'admin@library.com')
+    barcode = sample(BookCopy.barcode, 'LIB-000001')
+    copy_id = sample(BookCopy.copy_id, 1)
+    session_id = sample(UserSession.session_id, 'missing')
+    today = datetime.utcnow()
+
+    return [
+        # routes/auth.py
+        ('auth.login: user by email',
+         User.query.filter_by(email=email).limit(1).statement, ()),
+        ('auth.me: user by id',
+         User.query.filter_by(user_id=user_id).statement, ()),
+        ('auth.register: email exists',
+         User.query.filter_by(email=email).limit(1).statement, ()),
+        # sessions.py (login_required / admin_required and the sweeper)
+        ('sessions: session by id',
+         session_lookup_query(session_id, today), ()),
+        ('sessions: version check',
+         session_version_query(), ()),
+        ('sessions: sweep expired batch',
+         expired_sessions_delete(today, 1000), ()),
+        # routes/admin.py
+        # Approved students are most of users, so a full scan is the right plan
+        ('admin.stats: approved students',
+         count_statement(User.query.filter_by(role_id=student_role_id, status='APPROVED')),
+         ('users',)),
+        ('admin.stats: total books',
+         count_statement(Book.query), ('books',)),
+        ('admin.stats: books borrowed',
+         count_statement(Borrow.query.filter_by(status='BORROWED')), ()),
+        ('admin.stats: overdue books',
+         count_statement(Borrow.query.filter(Borrow.status == 'BORROWED', Borrow.due_date < today)),
+         ()),
+        ('admin.stats: pending verifications',
+         count_statement(User.query.filter_by(status='PENDING')), ()),
+        ('admin.recent_activities',
+         AuditLog.query.order_by(AuditLog.timestamp.desc()).limit(5).statement, ()),
+        ('admin.pending_users',
+         User.query.filter_by(status='PENDING').order_by(User.created_at.desc()).statement, ()),
+        # routes/circulation.py
+        ('circulation: copy by barcode',
+         BookCopy.query.filter_by(barcode=barcode).with_for_update().limit(1).statement, ()),
+        ('circulation: active borrow for copy',
+         Borrow.query.filter(Borrow.copy_id == copy_id, Borrow.status.in_(['BORROWED', 'OVERDUE']))
+             .limit(1).statement, ()),
+    ]
+
+def export_queries():
+    """(name, statement, tables allowed to seq scan) for the streaming exports
+
+    These run through a server-side cursor, so they are EXPLAINed as DECLARE
+    CURSOR to get the fast-start plan Postgres actually uses for them.
+    """
+    since = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    return [
+        (f'export: {table}', build_export_query(table), ())
+        for table in ('users', 'borrows', 'auditlog')
+    ] + [
+        (f'export: {table} since', build_export_query(table, {'since': since}), ())
+        for table in ('users', 'borrows', 'auditlog')
+    ]
+
+def table_sizes():
+    """Estimated row counts from the planner statistics"""
+    rows = db.session.execute(text("""
+        SELECT c.relname, c.reltuples::bigint
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind = 'r' AND n.nspname = current_schema()
+    """))
+    return {name: max(count, 0) for name, count in rows}
+
+def explain(stmt, cursor=False):
+    compiled = stmt.compile(dialect=db.engine.dialect)
+    prefix = 'DECLARE plan_check CURSOR FOR ' if cursor else ''
+    result = db.session.connection().exec_driver_sql(
+        'EXPLAIN (FORMAT JSON) ' + prefix + str(compiled), compiled.params
+    )
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+def relations(node):
+    """All relations scanned in a plan subtree"""
+    found = set()
+    if 'Relation Name' in node:
+        found.add(node['Relation Name'])
+    for child in node.get('Plans', []):
+        found |= relations(child)
+    return found
+
+def find_problems(node, sizes, threshold, allowed):
+    """Seq scans and sorts over tables larger than the threshold"""
+    problems = []
+    node_type = node['Node Type']
+    if node_type == 'Seq Scan':
+        table = node['Relation Name']
+        if table not in allowed and sizes.get(table, 0) > threshold:
+            problems.append(f"Seq Scan on {table} (~{sizes[table]} rows)")
+    elif node_type == 'Sort':
+        for table in sorted(relations(node)):
+            if sizes.get(table, 0) > threshold:
+                problems.append(f"Sort over {table} (~{sizes[table]} rows), key: {', '.join(node.get('Sort Key', []))}")
+    for child in node.get('Plans', []):
+        problems.extend(find_problems(child, sizes, threshold, allowed))
+    return problems
+
+def check_query_plans(threshold=DEFAULT_THRESHOLD, verbose=False):
+    """Run every check and return the number of failing queries"""
+    app = create_app({'SESSION_SWEEPER_ENABLED': False})
+    with app.app_context():
+        sizes = table_sizes()
+        print(f"Checking query plans (threshold: {threshold} rows)...")
+        for table in ('users', 'books', 'book_copies', 'borrows', 'auditlog', 'sessions'):
+            print(f"  {table}: ~{sizes.get(table, 0)} rows")
+        print()
+
+        failures = 0
+        checks = [(name, stmt, allowed, False) for name, stmt, allowed in hot_queries()]
+        checks += [(name, stmt, allowed, True) for name, stmt, allowed in export_queries()]
+        for name, stmt, allowed, cursor in checks:
+            plan = explain(stmt, cursor)
+            problems = find_problems(plan, sizes, threshold, set(allowed))
+            if problems:
+                failures += 1
+                print(f"✗ {name}")
+                for problem in problems:
+                    print(f"    {problem}")
+            else:
+                print(f"✓ {name}")
+            if verbose or problems:
+                print(json.dumps(plan, indent=2))
+        db.session.rollback()
+
+    print(f"\n{failures} failing quer{'y' if failures == 1 else 'ies'}")
+    return failures
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fail on seq scans or sorts over large tables')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help='Row count above which seq scans and sorts fail')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Print every plan')
+    args = parser.parse_args()
+    sys.exit(1 if check_query_plans(args.threshold, args.verbose) else 0)
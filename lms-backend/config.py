@@ -34,5 +34,18 @@ class Config:
         'pool_pre_ping': True,
     }
     
+    # Circulation
+    LOAN_PERIOD_DAYS = int(os.getenv('LOAN_PERIOD_DAYS', '14'))
+    
+    # Server-side sessions
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'sql')  # sql, memory
+    SESSION_LIFETIME_HOURS = int(os.getenv('SESSION_LIFETIME_HOURS', '24'))
+    SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', '10000'))
+    SESSION_VERSION_CHECK_SECONDS = float(os.getenv('SESSION_VERSION_CHECK_SECONDS', '2'))
+    SESSION_CACHE_TTL_SECONDS = float(os.getenv('SESSION_CACHE_TTL_SECONDS', '60'))
+    SESSION_SWEEPER_ENABLED = os.getenv('SESSION_SWEEPER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    SESSION_SWEEP_INTERVAL_SECONDS = int(os.getenv('SESSION_SWEEP_INTERVAL_SECONDS', '300'))  # 0 disables
+    SESSION_SWEEP_BATCH_SIZE = int(os.getenv('SESSION_SWEEP_BATCH_SIZE', '1000'))
+    
     # CORS configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5173,http://localhost:5174').split(',')
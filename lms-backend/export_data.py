@@ -0,0 +1,62 @@
+"""
+Data export script
+Streams users, borrows or auditlog to a CSV or JSONL file (or stdout)
+without loading the whole table into memory.
+
+Examples:
+    python export_data.py auditlog --format jsonl --since 2024-01-01 -o audit.jsonl.gz --gzip
+    python export_data.py borrows --filter status=BORROWED
+"""
+import argparse
+import sys
+from app import create_app
+from models import db
+from exports import EXPORTS, EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, stream_export
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Export library data as CSV or JSONL')
+    parser.add_argument('table', choices=sorted(EXPORTS))
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+    parser.add_argument('--since', help='Only rows on or after this ISO date/datetime')
+    parser.add_argument('--until', help='Only rows before this ISO date/datetime')
+    parser.add_argument('--filter', action='append', default=[], metavar='NAME=VALUE',
+                        help='Equality filter, e.g. status=APPROVED (repeatable)')
+    parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    return parser.parse_args()
+
+def export_data():
+    """Stream the requested export to a file or stdout"""
+    args = parse_args()
+
+    filters = {'since': args.since, 'until': args.until}
+    for item in args.filter:
+        name, sep, value = item.partition('=')
+        if not sep:
+            print(f"✗ Invalid filter '{item}', expected NAME=VALUE", file=sys.stderr)
+            sys.exit(2)
+        filters[name] = value
+
+    app = create_app({'SESSION_SWEEPER_ENABLED': False})
+    with app.app_context():
+        try:
+            stream = stream_export(db.engine, args.table, fmt=args.format, filters=filters,
+                                   compress=args.gzip, chunk_size=args.chunk_size)
+        except ValueError as e:
+            print(f"✗ {e}", file=sys.stderr)
+            sys.exit(2)
+
+        out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+        try:
+            for data in stream:
+                out.write(data)
+        finally:
+            if args.output:
+                out.close()
+
+    if args.output:
+        print(f"✓ Exported {args.table} to {args.output}", file=sys.stderr)
+
+if __name__ == '__main__':
+    export_data()
@@ -0,0 +1,207 @@
+"""
+Streaming data exports
+Builds Core queries for the exportable tables and streams them as CSV or JSONL
+through a server-side cursor, so exports run in bounded memory.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from sqlalchemy import select
+from models import User, Role, Borrow, AuditLog
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+def _users_query():
+    users = User.__table__
+    roles = Role.__table__
+    stmt = select(
+        users.c.user_id,
+        users.c.name,
+        users.c.email,
+        users.c.phone,
+        roles.c.role_name,
+        users.c.status,
+        users.c.approved_by,
+        users.c.approved_at,
+        users.c.created_at,
+    ).select_from(users.outerjoin(roles, users.c.role_id == roles.c.role_id))
+    return stmt, users.c.user_id, users.c.created_at
+
+def _borrows_query():
+    borrows = Borrow.__table__
+    stmt = select(
+        borrows.c.borrow_id,
+        borrows.c.user_id,
+        borrows.c.book_id,
+        borrows.c.copy_id,
+        borrows.c.borrow_date,
+        borrows.c.due_date,
+        borrows.c.return_date,
+        borrows.c.status,
+    )
+    return stmt, borrows.c.borrow_id, borrows.c.borrow_date
+
+def _auditlog_query():
+    auditlog = AuditLog.__table__
+    users = User.__table__
+    stmt = select(
+        auditlog.c.log_id,
+        auditlog.c.user_id,
+        users.c.name.label('user_name'),
+        auditlog.c.action,
+        auditlog.c.table_name,
+        auditlog.c.record_id,
+        auditlog.c.timestamp,
+    ).select_from(auditlog.outerjoin(users, auditlog.c.user_id == users.c.user_id))
+    return stmt, auditlog.c.log_id, auditlog.c.timestamp
+
+# table name -> (query builder, {filter name: column})
+EXPORTS = {
+    'users': (_users_query, {
+        'status': User.__table__.c.status,
+        'role': Role.__table__.c.role_name,
+    }),
+    'borrows': (_borrows_query, {
+        'status': Borrow.__table__.c.status,
+        'user_id': Borrow.__table__.c.user_id,
+        'book_id': Borrow.__table__.c.book_id,
+    }),
+    'auditlog': (_auditlog_query, {
+        'action': AuditLog.__table__.c.action,
+        'table_name': AuditLog.__table__.c.table_name,
+        'user_id': AuditLog.__table__.c.user_id,
+    }),
+}
+
+def _parse_datetime(name, value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO 8601 date or datetime')
+
+def build_export_query(table, filters=None):
+    """Build the export SELECT for a table, applying equality and date-range filters.
+
+    Supported filters are the keys in EXPORTS plus `since`/`until`, which bound
+    the table's date column. Rows come out in primary key order, or in date
+    order when a date range is given. Unknown filters raise ValueError.
+    """
+    if table not in EXPORTS:
+        raise ValueError(f'Unknown export table: {table}')
+
+    builder, filter_columns = EXPORTS[table]
+    stmt, order_column, date_column = builder()
+    date_range = False
+
+    for name, value in (filters or {}).items():
+        if value is None or value == '':
+            continue
+        if name == 'since':
+            stmt = stmt.where(date_column >= _parse_datetime(name, value))
+            date_range = True
+        elif name == 'until':
+            stmt = stmt.where(date_column < _parse_datetime(name, value))
+            date_range = True
+        elif name in filter_columns:
+            column = filter_columns[name]
+            if name.endswith('_id'):
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f'{name} must be an integer')
+            elif name in ('status', 'action'):
+                value = str(value).upper()
+            stmt = stmt.where(column == value)
+        else:
+            raise ValueError(f'Unknown filter for {table}: {name}')
+
+    # With a date range, walk the date index in order instead of sorting every match
+    if date_range:
+        return stmt.order_by(date_column, order_column)
+    return stmt.order_by(order_column)
+
+def iter_export_chunks(engine, stmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (columns, rows) chunks from a server-side cursor.
+
+    Uses its own connection so a long export never holds the request session,
+    and rows are returned as plain tuples without ORM hydration.
+    """
+    with engine.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True,
+            yield_per=chunk_size,
+        ).execute(stmt)
+        columns = list(result.keys())
+        yield columns, []  # header-only chunk, so empty exports still carry column names
+        for rows in result.partitions():
+            yield columns, rows
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+# Cells starting with these are run as formulas by spreadsheet apps
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    value = _format_value(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def _encode_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for columns, rows in chunks:
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        for row in rows:
+            writer.writerow([_csv_cell(v) for v in row])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+
+def _encode_jsonl(chunks):
+    for columns, rows in chunks:
+        if not rows:
+            continue
+        lines = [
+            json.dumps({c: _format_value(v) for c, v in zip(columns, row)})
+            for row in rows
+        ]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+def _gzip(stream):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for data in stream:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def stream_export(engine, table, fmt='csv', filters=None, compress=False,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return a generator of encoded bytes for a table export.
+
+    The query is built eagerly so invalid tables, formats and filters raise
+    ValueError before any output is produced.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'format must be one of: {", ".join(EXPORT_FORMATS)}')
+
+    stmt = build_export_query(table, filters)
+    chunks = iter_export_chunks(engine, stmt, chunk_size)
+    stream = _encode_csv(chunks) if fmt == 'csv' else _encode_jsonl(chunks)
+    return _gzip(stream) if compress else stream
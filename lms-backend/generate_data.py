@@ -0,0 +1,308 @@
+"""
+Synthetic data generator
+Bulk-loads users, books, book copies, borrows, sessions and audit log rows with
+COPY so queries can be exercised at realistic sizes. Run check_query_plans.py
+afterwards.
+
+Example:
+    python generate_data.py --users 200000 --books 50000 --borrows 2000000 --audit 10000000
+"""
+import argparse
+import csv
+import io
+import random
+import secrets
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from app import create_app
+from models import db, Role, User
+
+BATCH_SIZE = 50000
+
+# Weighted choices, roughly matching a live library
+USER_STATUSES = [('APPROVED', 90), ('PENDING', 3), ('REJECTED', 7)]
+USER_ROLES = [('Student', 90), ('Teacher', 10)]
+BORROW_STATUSES = [('RETURNED', 80), ('BORROWED', 16), ('OVERDUE', 4)]
+AUDIT_ACTIONS = [
+    ('LOGIN', 55), ('LOGOUT', 30), ('CREATE', 7), ('APPROVE', 4),
+    ('REJECT', 1), ('CHECKOUT', 2), ('RETURN', 1),
+]
+
+FIRST_NAMES = ['Aarav', 'Maya', 'Liam', 'Sofia', 'Noah', 'Priya', 'Ethan', 'Anika',
+               'Lucas', 'Zara', 'Omar', 'Hana', 'Leo', 'Isla', 'Ravi', 'Emma']
+LAST_NAMES = ['Sharma', 'Smith', 'Garcia', 'Khan', 'Nguyen', 'Brown', 'Thapa',
+              'Lopez', 'Wilson', 'Adhikari', 'Kim', 'Martin', 'Rai', 'Silva']
+TITLE_WORDS = ['History', 'Data', 'Modern', 'Systems', 'Ocean', 'Theory', 'Garden',
+               'Silent', 'Networks', 'Principles', 'River', 'Algorithms', 'Light']
+
+def weighted(choices):
+    values, weights = zip(*choices)
+    return lambda: random.choices(values, weights)[0]
+
+def zipf_picker(items, s=1.1):
+    """Pick items with Zipf-like skew: the first items are by far the most popular"""
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(items) + 1):
+        total += 1.0 / rank ** s
+        cum_weights.append(total)
+    return lambda: items[bisect_left(cum_weights, random.random() * total)]
+
+def random_time(start, end):
+    return start + timedelta(seconds=random.random() * (end - start).total_seconds())
+
+def copy_rows(cursor, table, columns, rows):
+    """Stream rows into a table with COPY, one batch at a time"""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow(['' if v is None else v for v in row])
+        count += 1
+        if count % BATCH_SIZE == 0:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+    return count
+
+def fetch_ids(cursor, sql, params=None):
+    cursor.execute(sql, params)
+    return [row[0] for row in cursor.fetchall()]
+
+def generate_data(args):
+    """Generate and bulk-load synthetic data"""
+    random.seed(args.seed)
+    tag = args.tag or format(int(time.time()), 'x')
+    now = datetime.utcnow()
+    start = now - timedelta(days=args.days)
+
+    app = create_app({'SESSION_SWEEPER_ENABLED': False})
+    with app.app_context():
+        roles = {r.role_name: r.role_id for r in Role.query.all()}
+        admin_id = User.query.filter_by(email='admin@library.com').with_entities(User.user_id).scalar()
+        # bcrypt is deliberately slow, so every synthetic user shares one hash
+        password_user = User()
+        password_user.set_password(args.password)
+        password_hash = password_user.password_hash
+        db.session.rollback()
+
+        conn = db.engine.raw_connection()
+        try:
+            cursor = conn.cursor()
+
+            # Users
+            print(f"Loading {args.users} users...")
+            pick_status = weighted(USER_STATUSES)
+            pick_role = weighted(USER_ROLES)
+
+            def user_rows():
+                for i in range(args.users):
+                    status = pick_status()
+                    created_at = random_time(start, now)
+                    approved = status != 'PENDING'
+                    yield (
+                        f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}",
+                        f"synthetic-{tag}-{i}@example.com",
+                        password_hash,
+                        f"98{random.randint(0, 99999999):08d}",
+                        roles[pick_role()],
+                        status,
+                        admin_id if approved else None,
+                        random_time(created_at, now) if approved else None,
+                        created_at,
+                    )
+
+            copy_rows(cursor, 'users',
+                      ['name', 'email', 'password_hash', 'phone', 'role_id', 'status',
+                       'approved_by', 'approved_at', 'created_at'],
+                      user_rows())
+            user_ids = fetch_ids(cursor, "SELECT user_id FROM users WHERE email LIKE %s AND status = 'APPROVED'",
+                                 (f"synthetic-{tag}-%",))
+            print(f"  ✓ {args.users} users ({len(user_ids)} approved)")
+
+            # Books
+            print(f"Loading {args.books} books...")
+
+            def book_rows():
+                for i in range(args.books):
+                    copies = random.choices([1, 2, 3, 5, 10], [50, 25, 12, 8, 5])[0]
+                    yield (
+                        ' '.join(random.sample(TITLE_WORDS, random.randint(2, 4))),
+                        f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}",
+                        f"SYN-{tag}-{i}",
+                        copies,
+                        copies,
+                        random_time(start, now),
+                    )
+
+            copy_rows(cursor, 'books',
+                      ['title', 'author', 'isbn', 'total_copies', 'available_copies', 'created_at'],
+                      book_rows())
+            cursor.execute("SELECT book_id, total_copies FROM books WHERE isbn LIKE %s",
+                           (f"SYN-{tag}-%",))
+            book_copies = cursor.fetchall()
+            book_ids = [book_id for book_id, _ in book_copies]
+            random.shuffle(book_ids)  # popularity should not follow insertion order
+            print(f"  ✓ {len(book_ids)} books")
+
+            # Book copies, one per total_copies with a unique barcode
+            print("Loading book copies...")
+
+            def copy_rows_for_books():
+                for book_id, copies in book_copies:
+                    for n in range(copies):
+                        yield (book_id, f"SYN-{tag}-{book_id}-{n + 1}", 'AVAILABLE', random_time(start, now))
+
+            copy_count = copy_rows(cursor, 'book_copies',
+                                   ['book_id', 'barcode', 'status', 'created_at'],
+                                   copy_rows_for_books())
+            cursor.execute("SELECT copy_id, book_id FROM book_copies WHERE barcode LIKE %s",
+                           (f"SYN-{tag}-%",))
+            copies_by_book = {}
+            for copy_id, book_id in cursor.fetchall():
+                copies_by_book.setdefault(book_id, []).append(copy_id)
+            print(f"  ✓ {copy_count} copies")
+
+            # Borrows
+            if args.borrows and user_ids and book_ids:
+                print(f"Loading {args.borrows} borrows...")
+                pick_book = zipf_picker(book_ids)
+                pick_user = zipf_picker(user_ids, s=0.8)
+                pick_borrow_status = weighted(BORROW_STATUSES)
+                shelved = {book_id: list(copy_ids) for book_id, copy_ids in copies_by_book.items()}
+
+                def borrow_rows():
+                    for _ in range(args.borrows):
+                        status = pick_borrow_status()
+                        book_id = pick_book()
+                        if status != 'RETURNED':
+                            if shelved[book_id]:
+                                copy_id = shelved[book_id].pop()
+                            else:
+                                status = 'RETURNED'  # every copy of this title is already out
+                        if status == 'RETURNED':
+                            copy_id = random.choice(copies_by_book[book_id])
+                            borrow_date = random_time(start, now - timedelta(days=1))
+                            due_date = borrow_date + timedelta(days=14)
+                            return_date = random_time(borrow_date, min(now, due_date + timedelta(days=7)))
+                        elif status == 'OVERDUE':
+                            borrow_date = random_time(start, now - timedelta(days=15))
+                            due_date = borrow_date + timedelta(days=14)
+                            return_date = None
+                        else:
+                            borrow_date = random_time(now - timedelta(days=21), now)
+                            due_date = borrow_date + timedelta(days=14)
+                            return_date = None
+                        yield (pick_user(), book_id, copy_id, borrow_date, return_date, due_date, status)
+
+                copy_rows(cursor, 'borrows',
+                          ['user_id', 'book_id', 'copy_id', 'borrow_date', 'return_date', 'due_date', 'status'],
+                          borrow_rows())
+
+                # Copies on an active borrow are checked out
+                cursor.execute("""
+                    UPDATE book_copies c
+                    SET status = 'BORROWED'
+                    FROM borrows br
+                    WHERE br.copy_id = c.copy_id
+                      AND br.status IN ('BORROWED', 'OVERDUE')
+                      AND c.barcode LIKE %s
+                """, (f"SYN-{tag}-%",))
+                print(f"  ✓ {args.borrows} borrows")
+
+            # Keep the denormalized counters consistent with the copies
+            cursor.execute("""
+                UPDATE books b
+                SET total_copies = c.total,
+                    available_copies = c.available
+                FROM (
+                    SELECT book_id,
+                           COUNT(*) AS total,
+                           COUNT(*) FILTER (WHERE status = 'AVAILABLE') AS available
+                    FROM book_copies
+                    GROUP BY book_id
+                ) c
+                WHERE c.book_id = b.book_id AND b.isbn LIKE %s
+            """, (f"SYN-{tag}-%",))
+
+            # Sessions, mostly expired so the sweeper has work
+            if args.sessions and user_ids:
+                print(f"Loading {args.sessions} sessions...")
+                cursor.execute("""
+                    SELECT u.user_id, r.role_name
+                    FROM users u JOIN roles r ON r.role_id = u.role_id
+                    WHERE u.email LIKE %s AND u.status = 'APPROVED'
+                """, (f"synthetic-{tag}-%",))
+                session_users = cursor.fetchall()
+                pick_session_user = zipf_picker(session_users, s=0.8)
+                lifetime = timedelta(hours=app.config['SESSION_LIFETIME_HOURS'])
+
+                def session_rows():
+                    for _ in range(args.sessions):
+                        user_id, role_name = pick_session_user()
+                        created_at = random_time(start, now)
+                        yield (secrets.token_urlsafe(32), user_id, role_name, created_at, created_at + lifetime)
+
+                copy_rows(cursor, 'sessions',
+                          ['session_id', 'user_id', 'role_name', 'created_at', 'expires_at'],
+                          session_rows())
+                print(f"  ✓ {args.sessions} sessions")
+
+            # Audit log
+            if args.audit and user_ids:
+                print(f"Loading {args.audit} audit rows...")
+                pick_action = weighted(AUDIT_ACTIONS)
+                pick_actor = zipf_picker(user_ids, s=0.8)
+
+                def audit_rows():
+                    for _ in range(args.audit):
+                        action = pick_action()
+                        if action in ('APPROVE', 'REJECT'):
+                            yield (admin_id, action, 'users', random.choice(user_ids), random_time(start, now))
+                        elif action in ('CHECKOUT', 'RETURN'):
+                            yield (admin_id, action, 'borrows', None, random_time(start, now))
+                        else:
+                            actor = pick_actor()
+                            yield (actor, action, 'users', actor, random_time(start, now))
+
+                copy_rows(cursor, 'auditlog',
+                          ['user_id', 'action', 'table_name', 'record_id', 'timestamp'],
+                          audit_rows())
+                print(f"  ✓ {args.audit} audit rows")
+
+            # Refresh planner statistics so EXPLAIN reflects the new volumes
+            print("Analyzing tables...")
+            for table in ('users', 'books', 'book_copies', 'borrows', 'auditlog', 'sessions'):
+                cursor.execute(f"ANALYZE {table}")
+
+            conn.commit()
+            cursor.close()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    print(f"\n✓ Synthetic data loaded (tag: {tag})")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Bulk-load synthetic library data')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--books', type=int, default=5000)
+    parser.add_argument('--borrows', type=int, default=100000)
+    parser.add_argument('--audit', type=int, default=500000)
+    parser.add_argument('--sessions', type=int, default=50000)
+    parser.add_argument('--days', type=int, default=730, help='History window in days')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for repeatable data')
+    parser.add_argument('--tag', help='Suffix for synthetic emails/ISBNs (default: timestamp)')
+    parser.add_argument('--password', default='password123', help='Password for all synthetic users')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    generate_data(parse_args())
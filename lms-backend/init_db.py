@@ -7,7 +7,7 @@ from models import db, Role
 
 def init_database():
     """Initialize database with tables and seed data"""
-    app = create_app()
+    app = create_app({'SESSION_SWEEPER_ENABLED': False})
     
     with app.app_context():
         # Create all tables
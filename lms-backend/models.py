@@ -8,6 +8,11 @@ db = SQLAlchemy()
 class User(db.Model):
     """User model"""
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_status_created_at', 'status', 'created_at'),
+        db.Index('ix_users_role_id_status', 'role_id', 'status'),
+        db.Index('ix_users_created_at_user_id', 'created_at', 'user_id'),
+    )
     
     user_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -79,13 +84,41 @@ class Book(db.Model):
             'available_copies': self.available_copies
         }
 
+class BookCopy(db.Model):
+    """Physical copy of a book, identified by its barcode"""
+    __tablename__ = 'book_copies'
+    
+    copy_id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, db.ForeignKey('books.book_id'), nullable=False, index=True)
+    barcode = db.Column(db.String(50), unique=True, nullable=False)
+    status = db.Column(db.String(20), default='AVAILABLE', nullable=False)  # AVAILABLE, BORROWED, LOST, DAMAGED
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    book = db.relationship('Book', backref='copies')
+    
+    def to_dict(self):
+        """Convert book copy to dictionary"""
+        return {
+            'copy_id': self.copy_id,
+            'book_id': self.book_id,
+            'barcode': self.barcode,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 class Borrow(db.Model):
     """Borrow model"""
     __tablename__ = 'borrows'
+    __table_args__ = (
+        db.Index('ix_borrows_status_due_date', 'status', 'due_date'),
+        db.Index('ix_borrows_borrow_date_borrow_id', 'borrow_date', 'borrow_id'),
+    )
     
     borrow_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
     book_id = db.Column(db.Integer, db.ForeignKey('books.book_id'), nullable=False)
+    copy_id = db.Column(db.Integer, db.ForeignKey('book_copies.copy_id'), nullable=True, index=True)
     borrow_date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     return_date = db.Column(db.DateTime, nullable=True)
     due_date = db.Column(db.DateTime, nullable=False)
@@ -94,6 +127,7 @@ class Borrow(db.Model):
     # Relationships
     user = db.relationship('User', backref='borrows')
     book = db.relationship('Book', backref='borrows')
+    copy = db.relationship('BookCopy', backref='borrows')
     
     def to_dict(self):
         """Convert borrow to dictionary"""
@@ -101,6 +135,7 @@ class Borrow(db.Model):
             'borrow_id': self.borrow_id,
             'user_id': self.user_id,
             'book_id': self.book_id,
+            'copy_id': self.copy_id,
             'borrow_date': self.borrow_date.isoformat() if self.borrow_date else None,
             'return_date': self.return_date.isoformat() if self.return_date else None,
             'due_date': self.due_date.isoformat() if self.due_date else None,
@@ -116,7 +151,7 @@ class AuditLog(db.Model):
     action = db.Column(db.String(50), nullable=False)  # CREATE, UPDATE, DELETE, APPROVE, REJECT
     table_name = db.Column(db.String(50), nullable=False)
     record_id = db.Column(db.Integer, nullable=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     # Relationships
     user = db.relationship('User', backref='audit_logs')
@@ -132,3 +167,20 @@ class AuditLog(db.Model):
             'record_id': self.record_id,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
+
+class UserSession(db.Model):
+    """Server-side login session"""
+    __tablename__ = 'sessions'
+    
+    session_id = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False, index=True)
+    role_name = db.Column(db.String(50), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class SessionVersion(db.Model):
+    """Single-row counter bumped on every revocation so workers can drop cached sessions"""
+    __tablename__ = 'session_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, default=0, nullable=False)
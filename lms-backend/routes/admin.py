@@ -1,10 +1,24 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, jsonify, session
 from models import db, User, Role, Book, Borrow, AuditLog
 from datetime import datetime, timedelta
 from routes.auth import admin_required
+from exports import EXPORT_FORMATS, stream_export
+from sessions import get_session_store
 
 admin_bp = Blueprint('admin', __name__)
 
+def _log_stream_errors(stream, table, logger):
+    """Log export failures that happen after the 200 response has started
+
+    The error is re-raised so the server aborts the chunked response and the
+    client sees a broken transfer rather than a clean end of file.
+    """
+    try:
+        yield from stream
+    except Exception:
+        logger.exception(f'Export of {table} failed mid-stream; the client received a truncated file')
+        raise
+
 @admin_bp.route('/stats', methods=['GET'])
 @admin_required
 def get_stats():
@@ -132,6 +146,9 @@ def verify_user(user_id):
         db.session.add(audit_log)
         db.session.commit()
         
+        if action == 'reject':
+            get_session_store().revoke_users([user_id])
+        
         action_message = 'approved' if action == 'approve' else 'rejected'
         return jsonify({
             'message': f'User {action_message} successfully'
@@ -140,3 +157,78 @@ def verify_user(user_id):
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e), 'status': 500}), 500
+
+@admin_bp.route('/revoke-sessions', methods=['POST'])
+@admin_required
+def revoke_sessions():
+    """Log out every session of the given users on all workers"""
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('user_ids'), list) or not data['user_ids']:
+            return jsonify({'error': 'user_ids must be a non-empty list', 'status': 400}), 400
+        
+        try:
+            user_ids = {int(user_id) for user_id in data['user_ids']}
+        except (TypeError, ValueError):
+            return jsonify({'error': 'user_ids must be integers', 'status': 400}), 400
+        
+        revoked = get_session_store().revoke_users(user_ids)
+        
+        # Log action
+        admin_user_id = session.get('user_id')
+        db.session.add_all([
+            AuditLog(
+                user_id=admin_user_id,
+                action='REVOKE',
+                table_name='sessions',
+                record_id=user_id
+            )
+            for user_id in user_ids
+        ])
+        db.session.commit()
+        
+        return jsonify({
+            'message': f'Revoked {revoked} session(s)',
+            'revoked': revoked
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'status': 500}), 500
+
+@admin_bp.route('/export/<table>', methods=['GET'])
+@admin_required
+def export_table(table):
+    """Stream users, borrows or auditlog as CSV or JSONL"""
+    try:
+        args = request.args.to_dict()
+        fmt = args.pop('format', 'csv').lower()
+        compress = args.pop('gzip', '').lower() in ('1', 'true', 'yes')
+
+        try:
+            stream = stream_export(db.engine, table, fmt=fmt, filters=args, compress=compress)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 400}), 400
+
+        # Log action
+        audit_log = AuditLog(
+            user_id=session.get('user_id'),
+            action='EXPORT',
+            table_name=table
+        )
+        db.session.add(audit_log)
+        db.session.commit()
+
+        filename = f'{table}-{datetime.utcnow().strftime("%Y%m%d%H%M%S")}.{fmt}'
+        headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+        if compress:
+            headers['Content-Encoding'] = 'gzip'
+
+        # The app context is gone by the time the body streams, so bind the logger now
+        stream = _log_stream_errors(stream, table, current_app.logger)
+        return Response(stream, mimetype=EXPORT_FORMATS[fmt], headers=headers)
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'status': 500}), 500
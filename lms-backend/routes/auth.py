@@ -2,14 +2,23 @@ from flask import Blueprint, request, jsonify, session
 from models import db, User, Role, AuditLog
 from datetime import datetime
 from functools import wraps
+from sessions import get_session_store
 
 auth_bp = Blueprint('auth', __name__)
 
+def current_session():
+    """Return the server-side session record for this request, or None if revoked/expired"""
+    record = get_session_store().get(session.get('sid'))
+    if not record or record['user_id'] != session.get('user_id'):
+        session.clear()
+        return None
+    return record
+
 def login_required(f):
     """Decorator to require login"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        if not current_session():
             return jsonify({'error': 'Authentication required', 'status': 401}), 401
         return f(*args, **kwargs)
     return decorated_function
@@ -18,11 +27,12 @@ def admin_required(f):
     """Decorator to require admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        record = current_session()
+        if not record:
             return jsonify({'error': 'Authentication required', 'status': 401}), 401
         
-        user = User.query.get(session['user_id'])
-        if not user or not user.role or user.role.role_name != 'Admin':
+        # Role comes from the cached session; revoke sessions when a role changes
+        if record['role_name'] != 'Admin':
             return jsonify({'error': 'Admin access required', 'status': 403}), 403
         
         return f(*args, **kwargs)
@@ -109,8 +119,11 @@ def login():
             }), 403
         
         # Set session
+        role_name = user.role.role_name if user.role else None
+        record = get_session_store().create(user.user_id, role_name)
+        session.clear()
+        session['sid'] = record['session_id']
         session['user_id'] = user.user_id
-        session['role'] = user.role.role_name if user.role else None
         
         # Log login
         audit_log = AuditLog(
@@ -142,6 +155,9 @@ def logout():
     try:
         user_id = session.get('user_id')
         
+        if session.get('sid'):
+            get_session_store().delete(session['sid'])
+        
         if user_id:
             # Log logout
             audit_log = AuditLog(
@@ -0,0 +1,191 @@
+from flask import Blueprint, current_app, request, jsonify, session
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from models import db, User, Book, BookCopy, Borrow, AuditLog
+from datetime import datetime, timedelta
+from routes.auth import admin_required
+
+circulation_bp = Blueprint('circulation', __name__)
+
+def _lock_copy(barcode):
+    """Resolve a barcode through its unique index and lock the copy row"""
+    return BookCopy.query.filter_by(barcode=barcode).with_for_update().first()
+
+def _adjust_available(book_id, delta):
+    """Atomically adjust the denormalized available_copies counter"""
+    stmt = update(Book).where(Book.book_id == book_id)
+    if delta < 0:
+        stmt = stmt.where(Book.available_copies >= -delta)
+    else:
+        stmt = stmt.where(Book.available_copies + delta <= Book.total_copies)
+    stmt = stmt.values(available_copies=Book.available_copies + delta)
+    return db.session.execute(stmt, execution_options={'synchronize_session': False}).rowcount
+
+def _sync_counters(book):
+    """Derive a tracked book's counters from its BookCopy rows"""
+    total, available = db.session.query(
+        func.count(BookCopy.copy_id),
+        func.count(BookCopy.copy_id).filter(BookCopy.status == 'AVAILABLE')
+    ).filter(BookCopy.book_id == book.book_id).one()
+    book.total_copies = total
+    book.available_copies = available
+
+@circulation_bp.route('/copies', methods=['POST'])
+@admin_required
+def add_copy():
+    """Register a physical copy of a book
+
+    Counters of a book count its copies once tracking starts, so registering
+    existing stock does not inflate them.
+    """
+    try:
+        data = request.get_json()
+
+        if not data or not data.get('book_id') or not data.get('barcode'):
+            return jsonify({'error': 'book_id and barcode are required', 'status': 400}), 400
+
+        try:
+            book_id = int(data['book_id'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'book_id must be an integer', 'status': 400}), 400
+
+        barcode = str(data['barcode']).strip()
+        if BookCopy.query.filter_by(barcode=barcode).first():
+            return jsonify({'error': 'Barcode already registered', 'status': 400}), 400
+
+        book = Book.query.with_for_update().filter_by(book_id=book_id).first()
+        if not book:
+            return jsonify({'error': 'Book not found', 'status': 404}), 404
+
+        copy = BookCopy(book_id=book.book_id, barcode=barcode, status='AVAILABLE')
+        db.session.add(copy)
+        db.session.flush()
+        _sync_counters(book)
+
+        # Log action
+        db.session.add(AuditLog(
+            user_id=session.get('user_id'),
+            action='CREATE',
+            table_name='book_copies',
+            record_id=copy.copy_id
+        ))
+        db.session.commit()
+
+        return jsonify({'message': 'Copy added successfully', 'copy': copy.to_dict()}), 201
+
+    except IntegrityError:
+        # Concurrent registration of the same barcode lost the race on the unique index
+        db.session.rollback()
+        return jsonify({'error': 'Barcode already registered', 'status': 400}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'status': 500}), 500
+
+@circulation_bp.route('/checkout', methods=['POST'])
+@admin_required
+def checkout():
+    """Check out the copy with the scanned barcode to a user"""
+    try:
+        data = request.get_json()
+
+        if not data or not data.get('barcode') or not data.get('user_id'):
+            return jsonify({'error': 'barcode and user_id are required', 'status': 400}), 400
+
+        try:
+            user_id = int(data['user_id'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'user_id must be an integer', 'status': 400}), 400
+
+        copy = _lock_copy(str(data['barcode']).strip())
+        if not copy:
+            db.session.rollback()
+            return jsonify({'error': 'Unknown barcode', 'status': 404}), 404
+
+        if copy.status != 'AVAILABLE':
+            db.session.rollback()
+            return jsonify({'error': f'Copy status is {copy.status}', 'status': 409}), 409
+
+        user = User.query.get(user_id)
+        if not user or user.status != 'APPROVED':
+            db.session.rollback()
+            return jsonify({'error': 'User not found or not approved', 'status': 400}), 400
+
+        if not _adjust_available(copy.book_id, -1):
+            db.session.rollback()
+            return jsonify({'error': 'No available copies recorded for this book', 'status': 409}), 409
+
+        now = datetime.utcnow()
+        borrow = Borrow(
+            user_id=user.user_id,
+            book_id=copy.book_id,
+            copy_id=copy.copy_id,
+            borrow_date=now,
+            due_date=now + timedelta(days=current_app.config['LOAN_PERIOD_DAYS']),
+            status='BORROWED'
+        )
+        copy.status = 'BORROWED'
+        db.session.add(borrow)
+        db.session.flush()
+
+        # Log action
+        db.session.add(AuditLog(
+            user_id=session.get('user_id'),
+            action='CHECKOUT',
+            table_name='borrows',
+            record_id=borrow.borrow_id
+        ))
+        db.session.commit()
+
+        return jsonify({'message': 'Checkout successful', 'borrow': borrow.to_dict()}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'status': 500}), 500
+
+@circulation_bp.route('/return', methods=['POST'])
+@admin_required
+def return_copy():
+    """Return the copy with the scanned barcode"""
+    try:
+        data = request.get_json()
+
+        if not data or not data.get('barcode'):
+            return jsonify({'error': 'barcode is required', 'status': 400}), 400
+
+        copy = _lock_copy(str(data['barcode']).strip())
+        if not copy:
+            db.session.rollback()
+            return jsonify({'error': 'Unknown barcode', 'status': 404}), 404
+
+        borrow = Borrow.query.filter(
+            Borrow.copy_id == copy.copy_id,
+            Borrow.status.in_(['BORROWED', 'OVERDUE'])
+        ).with_for_update().first()
+        if copy.status != 'BORROWED' or not borrow:
+            db.session.rollback()
+            return jsonify({'error': 'Copy is not checked out', 'status': 409}), 409
+
+        borrow.status = 'RETURNED'
+        borrow.return_date = datetime.utcnow()
+        copy.status = 'AVAILABLE'
+        if not _adjust_available(copy.book_id, 1):
+            # Counter already at total_copies: it drifted from the copy states, so rebuild it
+            current_app.logger.warning(
+                f'available_copies of book {copy.book_id} out of sync on return; resyncing from copies'
+            )
+            _sync_counters(Book.query.with_for_update().filter_by(book_id=copy.book_id).first())
+
+        # Log action
+        db.session.add(AuditLog(
+            user_id=session.get('user_id'),
+            action='RETURN',
+            table_name='borrows',
+            record_id=borrow.borrow_id
+        ))
+        db.session.commit()
+
+        return jsonify({'message': 'Return successful', 'borrow': borrow.to_dict()}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'status': 500}), 500
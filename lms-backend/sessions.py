@@ -0,0 +1,360 @@
+"""
+Server-side session store
+Login sessions live in a pluggable backend (PostgreSQL table, or memory for tests)
+behind a per-worker LRU cache. Logouts and revocations bump a shared version
+number; each worker polls it every few seconds and drops its cache when it
+changes, so auth checks are served from memory but still honor revocations from
+other workers. Cached entries are also re-read after a short TTL, which bounds
+how long a session deleted out of band (e.g. by ON DELETE CASCADE) stays valid.
+"""
+import os
+import secrets
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from models import db, UserSession, SessionVersion
+
+class SessionBackend(ABC):
+    """Storage interface for session records
+
+    A record is a dict with session_id, user_id, role_name, created_at and expires_at.
+    """
+
+    @abstractmethod
+    def create(self, record):
+        """Store a new session record"""
+
+    @abstractmethod
+    def get(self, session_id):
+        """Return the unexpired record for session_id, or None"""
+
+    @abstractmethod
+    def delete(self, session_id):
+        """Delete one session; bump the version if it existed
+
+        Return the number of deleted sessions (0 or 1).
+        """
+
+    @abstractmethod
+    def revoke_users(self, user_ids):
+        """Delete every session of the given users; bump the version if any were deleted
+
+        Return the number of deleted sessions.
+        """
+
+    @abstractmethod
+    def version(self):
+        """Return the revocation version shared by all workers"""
+
+    @abstractmethod
+    def sweep_expired(self, now, batch_size):
+        """Delete up to batch_size expired sessions; return the count"""
+
+class MemorySessionBackend(SessionBackend):
+    """In-process backend for tests and single-worker development"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def create(self, record):
+        with self._lock:
+            self._sessions[record['session_id']] = dict(record)
+
+    def get(self, session_id):
+        with self._lock:
+            record = self._sessions.get(session_id)
+        if record and record['expires_at'] > datetime.utcnow():
+            return dict(record)
+        return None
+
+    def delete(self, session_id):
+        with self._lock:
+            if self._sessions.pop(session_id, None) is None:
+                return 0
+            self._version += 1
+        return 1
+
+    def revoke_users(self, user_ids):
+        user_ids = set(user_ids)
+        with self._lock:
+            revoked = [sid for sid, r in self._sessions.items() if r['user_id'] in user_ids]
+            for sid in revoked:
+                del self._sessions[sid]
+            if revoked:
+                self._version += 1
+        return len(revoked)
+
+    def version(self):
+        return self._version
+
+    def sweep_expired(self, now, batch_size):
+        with self._lock:
+            expired = [sid for sid, r in self._sessions.items() if r['expires_at'] <= now][:batch_size]
+            for sid in expired:
+                del self._sessions[sid]
+        return len(expired)
+
+def session_lookup_query(session_id, now):
+    """Unexpired session by id (also EXPLAINed by check_query_plans.py)"""
+    return (
+        select(UserSession)
+        .where(UserSession.session_id == session_id, UserSession.expires_at > now)
+        .limit(1)
+    )
+
+def session_version_query():
+    return select(SessionVersion.version).where(SessionVersion.id == 1)
+
+def expired_sessions_delete(now, batch_size):
+    """Delete one batch of expired sessions
+
+    SKIP LOCKED lets sweepers on several workers share the work.
+    """
+    expired = (
+        select(UserSession.session_id)
+        .where(UserSession.expires_at <= now)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    return delete(UserSession).where(UserSession.session_id.in_(expired))
+
+class SQLSessionBackend(SessionBackend):
+    """PostgreSQL backend using the sessions and session_version tables"""
+
+    def create(self, record):
+        db.session.add(UserSession(**record))
+        db.session.commit()
+
+    def get(self, session_id):
+        row = db.session.execute(
+            session_lookup_query(session_id, datetime.utcnow())
+        ).scalars().first()
+        if not row:
+            return None
+        return {
+            'session_id': row.session_id,
+            'user_id': row.user_id,
+            'role_name': row.role_name,
+            'created_at': row.created_at,
+            'expires_at': row.expires_at
+        }
+
+    def _bump_version(self):
+        db.session.execute(
+            insert(SessionVersion)
+            .values(id=1, version=1)
+            .on_conflict_do_update(
+                index_elements=[SessionVersion.id],
+                set_={'version': SessionVersion.version + 1}
+            )
+        )
+
+    def delete(self, session_id):
+        count = UserSession.query.filter_by(session_id=session_id).delete(synchronize_session=False)
+        if count:
+            self._bump_version()
+        db.session.commit()
+        return count
+
+    def revoke_users(self, user_ids):
+        count = UserSession.query.filter(
+            UserSession.user_id.in_(list(user_ids))
+        ).delete(synchronize_session=False)
+        # Only bump when something was deleted; a bump clears every worker's cache
+        if count:
+            self._bump_version()
+        db.session.commit()
+        return count
+
+    def version(self):
+        return db.session.execute(session_version_query()).scalar() or 0
+
+    def sweep_expired(self, now, batch_size):
+        result = db.session.execute(
+            expired_sessions_delete(now, batch_size),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+        return result.rowcount
+
+class SessionStore:
+    """Session store with a per-worker LRU cache in front of a backend"""
+
+    def __init__(self, backend, lifetime=timedelta(hours=24), cache_size=10000,
+                 version_check_seconds=2.0, cache_ttl_seconds=60.0):
+        self.backend = backend
+        self.lifetime = lifetime
+        self.cache_size = cache_size
+        self.version_check_seconds = version_check_seconds
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._cache = OrderedDict()  # session_id -> (record, cached_at)
+        self._lock = threading.Lock()
+        self._version = None
+        self._generation = 0  # bumped whenever the cache is cleared
+        self._checked_at = 0.0
+
+    def _check_version(self):
+        """Drop the cache if another worker revoked sessions since the last check"""
+        now = time.monotonic()
+        if now - self._checked_at < self.version_check_seconds:
+            return
+        version = self.backend.version()
+        with self._lock:
+            self._checked_at = now
+            if version != self._version:
+                self._version = version
+                self._cache.clear()
+                self._generation += 1
+
+    def _cache_put(self, record, generation):
+        with self._lock:
+            # A record read before a concurrent cache clear may already be revoked
+            if generation != self._generation:
+                return
+            self._cache[record['session_id']] = (record, time.monotonic())
+            self._cache.move_to_end(record['session_id'])
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def create(self, user_id, role_name):
+        """Create a session for a user and return its record"""
+        # Sync the version first so the next lookup does not clear this entry
+        self._check_version()
+        now = datetime.utcnow()
+        record = {
+            'session_id': secrets.token_urlsafe(32),
+            'user_id': user_id,
+            'role_name': role_name,
+            'created_at': now,
+            'expires_at': now + self.lifetime
+        }
+        self.backend.create(record)
+        with self._lock:
+            generation = self._generation
+        self._cache_put(dict(record), generation)
+        return record
+
+    def get(self, session_id):
+        """Return the record for a live session, or None"""
+        if not session_id:
+            return None
+        self._check_version()
+
+        with self._lock:
+            entry = self._cache.get(session_id)
+            if entry:
+                self._cache.move_to_end(session_id)
+            generation = self._generation
+
+        if entry:
+            record, cached_at = entry
+            if record['expires_at'] <= datetime.utcnow():
+                with self._lock:
+                    self._cache.pop(session_id, None)
+                return None
+            if time.monotonic() - cached_at < self.cache_ttl_seconds:
+                return record
+            # Trusted for long enough; re-read it in case it was deleted out of band
+
+        record = self.backend.get(session_id)
+        if record:
+            self._cache_put(record, generation)
+        elif entry:
+            with self._lock:
+                self._cache.pop(session_id, None)
+        return record
+
+    def delete(self, session_id):
+        """Log out one session on all workers"""
+        with self._lock:
+            self._cache.pop(session_id, None)
+        return self.backend.delete(session_id)
+
+    def revoke_users(self, user_ids):
+        """Revoke every session of the given users on all workers; return the count"""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return 0
+        with self._lock:
+            for sid in [sid for sid, (r, _) in self._cache.items() if r['user_id'] in user_ids]:
+                del self._cache[sid]
+        return self.backend.revoke_users(user_ids)
+
+    def sweep_expired(self, batch_size=1000):
+        """Delete expired sessions in batches; return the total count"""
+        now = datetime.utcnow()
+        total = 0
+        while True:
+            count = self.backend.sweep_expired(now, batch_size)
+            total += count
+            if count < batch_size:
+                return total
+
+BACKENDS = {
+    'sql': SQLSessionBackend,
+    'memory': MemorySessionBackend,
+}
+
+def _start_sweeper(app, store):
+    interval = app.config['SESSION_SWEEP_INTERVAL_SECONDS']
+    batch_size = app.config['SESSION_SWEEP_BATCH_SIZE']
+
+    def sweep():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    store.sweep_expired(batch_size)
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.warning(f'Session sweep failed: {e}')
+
+    threading.Thread(target=sweep, name='session-sweeper', daemon=True).start()
+
+def _register_sweeper(app, store):
+    """Start the sweeper on the first request handled by each process
+
+    Scripts and the debug reloader's parent never serve requests, and under a
+    preload/fork server every worker starts its own thread after the fork.
+    """
+    state = {'pid': None}
+    lock = threading.Lock()
+
+    @app.before_request
+    def start_session_sweeper():
+        if state['pid'] == os.getpid():
+            return
+        with lock:
+            if state['pid'] != os.getpid():
+                _start_sweeper(app, store)
+                state['pid'] = os.getpid()
+
+def init_app(app):
+    """Create the session store configured for this app"""
+    backend_name = app.config['SESSION_BACKEND']
+    if backend_name not in BACKENDS:
+        raise ValueError(f"SESSION_BACKEND must be one of: {', '.join(BACKENDS)}")
+
+    store = SessionStore(
+        BACKENDS[backend_name](),
+        lifetime=timedelta(hours=app.config['SESSION_LIFETIME_HOURS']),
+        cache_size=app.config['SESSION_CACHE_SIZE'],
+        version_check_seconds=app.config['SESSION_VERSION_CHECK_SECONDS'],
+        cache_ttl_seconds=app.config['SESSION_CACHE_TTL_SECONDS']
+    )
+    app.extensions['session_store'] = store
+
+    if app.config['SESSION_SWEEPER_ENABLED'] and app.config['SESSION_SWEEP_INTERVAL_SECONDS'] > 0:
+        _register_sweeper(app, store)
+    return store
+
+def get_session_store():
+    return current_app.extensions['session_store']
@@ -0,0 +1,173 @@
+"""
+Tests for the server-side session store
+Two SessionStore instances over one MemorySessionBackend stand in for two
+workers sharing the sessions table.
+
+Run with: python -m pytest test_sessions.py
+"""
+import time
+from datetime import timedelta
+import pytest
+from flask import Flask, session
+from sessions import SessionBackend, SessionStore, MemorySessionBackend
+from routes.auth import current_session
+
+class CountingBackend(MemorySessionBackend):
+    """Memory backend that counts lookups, to tell cache hits from backend reads"""
+
+    def __init__(self):
+        super().__init__()
+        self.gets = 0
+        self.sweeps = 0
+
+    def get(self, session_id):
+        self.gets += 1
+        return super().get(session_id)
+
+    def sweep_expired(self, now, batch_size):
+        self.sweeps += 1
+        return super().sweep_expired(now, batch_size)
+
+@pytest.fixture
+def backend():
+    return CountingBackend()
+
+def make_store(backend, **kwargs):
+    kwargs.setdefault('version_check_seconds', 0)
+    return SessionStore(backend, **kwargs)
+
+def test_backend_interface_is_abstract():
+    class Incomplete(SessionBackend):
+        def create(self, record):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_cached_lookup_skips_backend(backend):
+    store = make_store(backend)
+    record = store.create(1, 'Admin')
+
+    assert store.get(record['session_id'])['user_id'] == 1
+    assert backend.gets == 0
+
+def test_other_worker_reads_through_backend_once(backend):
+    w1, w2 = make_store(backend), make_store(backend)
+    sid = w1.create(1, 'Admin')['session_id']
+
+    assert w2.get(sid)['role_name'] == 'Admin'
+    assert w2.get(sid)['role_name'] == 'Admin'
+    assert backend.gets == 1
+
+def test_revocation_reaches_other_worker(backend):
+    w1, w2 = make_store(backend), make_store(backend)
+    sid = w1.create(1, 'Admin')['session_id']
+    other = w1.create(2, 'Student')['session_id']
+    assert w2.get(sid)
+
+    assert w1.revoke_users([1]) == 1
+    assert w1.get(sid) is None
+    assert w2.get(sid) is None
+    assert w2.get(other)['user_id'] == 2
+
+def test_revocation_waits_for_version_check(backend):
+    w1 = make_store(backend)
+    w2 = make_store(backend, version_check_seconds=0.05)
+    sid = w1.create(1, 'Admin')['session_id']
+    assert w2.get(sid)
+
+    w1.revoke_users([1])
+    assert w2.get(sid) is not None  # still cached until the next version check
+    time.sleep(0.1)
+    assert w2.get(sid) is None
+
+def test_logout_reaches_other_worker(backend):
+    w1 = make_store(backend)
+    w2 = make_store(backend, version_check_seconds=0.05)
+    sid = w1.create(1, 'Admin')['session_id']
+    assert w2.get(sid)
+
+    w1.delete(sid)
+    time.sleep(0.1)
+    assert w2.get(sid) is None
+
+def test_version_bumps_only_when_sessions_are_deleted(backend):
+    store = make_store(backend)
+    sid = store.create(1, 'Admin')['session_id']
+
+    assert store.revoke_users([2]) == 0
+    assert store.delete('missing') == 0
+    assert backend.version() == 0
+
+    assert store.delete(sid) == 1
+    assert backend.version() == 1
+
+def test_cache_entries_expire_after_ttl(backend):
+    w1 = make_store(backend)
+    w2 = make_store(backend, cache_ttl_seconds=0.05)
+    sid = w1.create(1, 'Admin')['session_id']
+    assert w2.get(sid)
+
+    # Deleted without a version bump, like ON DELETE CASCADE
+    del backend._sessions[sid]
+    assert w2.get(sid) is not None
+    time.sleep(0.1)
+    assert w2.get(sid) is None
+
+def test_expired_session_is_rejected(backend):
+    store = make_store(backend, lifetime=timedelta(seconds=-1))
+    sid = store.create(1, 'Admin')['session_id']
+
+    assert store.get(sid) is None
+
+def test_lru_evicts_least_recently_used(backend):
+    store = make_store(backend, cache_size=2)
+    first = store.create(1, 'Admin')['session_id']
+    second = store.create(2, 'Admin')['session_id']
+    store.get(first)  # first is now the most recently used
+    third = store.create(3, 'Admin')['session_id']
+
+    assert list(store._cache) == [first, third]
+    assert store.get(second)['user_id'] == 2  # still in the backend
+    assert backend.gets == 1
+
+def test_stale_read_is_not_cached_after_clear(backend):
+    store = make_store(backend)
+    record = store.create(1, 'Admin')
+    store._cache.clear()
+    generation = store._generation
+
+    # Another thread sees a version change and clears the cache mid-read
+    backend._version += 1
+    store._check_version()
+
+    store._cache_put(record, generation)
+    assert record['session_id'] not in store._cache
+
+def test_sweep_expired_runs_in_batches(backend):
+    store = make_store(backend, lifetime=timedelta(seconds=-1))
+    for user_id in range(5):
+        store.create(user_id, 'Student')
+    live = make_store(backend).create(9, 'Student')['session_id']
+
+    assert store.sweep_expired(batch_size=2) == 5
+    assert backend.sweeps == 3
+    assert list(backend._sessions) == [live]
+
+def test_current_session_rejects_mismatched_user(backend):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    store = make_store(backend)
+    app.extensions['session_store'] = store
+    record = store.create(1, 'Admin')
+
+    with app.test_request_context():
+        session['sid'] = record['session_id']
+        session['user_id'] = 1
+        assert current_session()['role_name'] == 'Admin'
+
+    with app.test_request_context():
+        session['sid'] = record['session_id']
+        session['user_id'] = 2
+        assert current_session() is None
+        assert 'sid' not in session